@@ -272,7 +272,7 @@ func runServer(args []string) {
 			//   - application/json: JSON data
 			data := storeRoutes.Group("/data")
 			{
-				data.POST("", unifiedHandler.Put)
+				data.POST("", middleware.DecompressRequest(middleware.DefaultMaxDecompressedSize), unifiedHandler.Put) // Accepts Content-Encoding: gzip
 				data.GET("/time/:timestamp", unifiedHandler.GetByTime)
 				data.DELETE("/time/:timestamp", unifiedHandler.DeleteByTime)
 				data.GET("/oldest", unifiedHandler.ListOldest)
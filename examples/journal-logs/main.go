@@ -23,9 +23,18 @@ import (
 	"os"
 	"os/exec"
 	"strings"
+	"sync/atomic"
 	"time"
 )
 
+// maxInFlight bounds how many entries may be sent before their responses arrive
+const maxInFlight = 32
+
+var (
+	okPrefix = []byte("OK")
+	newline  = []byte("\n")
+)
+
 // JournalEntry represents a parsed journalctl JSON entry
 type JournalEntry struct {
 	Timestamp         string `json:"__REALTIME_TIMESTAMP,omitempty"`
@@ -118,23 +127,31 @@ func main() {
 
 	// Process output
 	reader := bufio.NewReader(cmdStdout)
-	var conn net.Conn
-	var connWriter *bufio.Writer
-	var connReader *bufio.Reader
+	var pipe *pipeline
+
+	var totalSent, totalErrors atomic.Int64
 
 	// Connect to socket if not stdout mode
 	if !*stdout && !useHTTP {
-		conn, connWriter, connReader, err = connectAndAuth(*socketPath, *storeName, *apiKey)
+		conn, connWriter, connReader, err := connectAndAuth(*socketPath, *storeName, *apiKey)
 		if err != nil {
 			log.Fatalf("Failed to connect to ts-store: %v", err)
 		}
-		defer conn.Close()
+		pipe = newPipeline(conn, connWriter, connReader, &totalSent, &totalErrors)
 	}
 
-	var totalSent, totalErrors int64
 	lastStatsTime := time.Now()
 
+	var encoded bytes.Buffer
+	encoder := json.NewEncoder(&encoded)
+
 	for {
+		// Send queued entries before waiting on journalctl, so a burst of
+		// entries goes out in one write
+		if pipe != nil && !lineBuffered(reader) {
+			pipe.flush() // errors resurface on the next write
+		}
+
 		line, err := reader.ReadString('\n')
 		if err != nil {
 			if err == io.EOF {
@@ -160,52 +177,69 @@ func main() {
 		// Convert to our simplified format
 		logEntry := convertEntry(entry)
 
-		data, err := json.Marshal(logEntry)
-		if err != nil {
+		// Encode into a reused buffer; data is only valid until the next entry
+		encoded.Reset()
+		if err := encoder.Encode(logEntry); err != nil {
 			log.Printf("Failed to marshal log entry: %v", err)
 			continue
 		}
+		data := bytes.TrimSuffix(encoded.Bytes(), newline)
 
 		if *stdout {
 			fmt.Println(string(data))
-			totalSent++
+			totalSent.Add(1)
 		} else if useHTTP {
 			if err := writeToHTTP(*httpURL, *storeName, *apiKey, data); err != nil {
-				totalErrors++
-				if totalErrors%100 == 1 {
+				if totalErrors.Add(1)%100 == 1 {
 					log.Printf("Warning: failed to write to ts-store: %v", err)
 				}
 			} else {
-				totalSent++
+				totalSent.Add(1)
 			}
 		} else {
-			if err := writeToSocket(connWriter, connReader, data); err != nil {
-				totalErrors++
-				if totalErrors%100 == 1 {
-					log.Printf("Warning: failed to write to ts-store: %v", err)
-				}
-				// Try to reconnect
-				conn.Close()
-				conn, connWriter, connReader, err = connectAndAuth(*socketPath, *storeName, *apiKey)
+			// Reconnect if the previous connection failed
+			if pipe == nil {
+				conn, connWriter, connReader, err := connectAndAuth(*socketPath, *storeName, *apiKey)
 				if err != nil {
+					totalErrors.Add(1)
 					log.Printf("Failed to reconnect: %v", err)
 					time.Sleep(5 * time.Second)
+					continue
 				}
-			} else {
-				totalSent++
+				pipe = newPipeline(conn, connWriter, connReader, &totalSent, &totalErrors)
+			}
+
+			// Responses are counted by the pipeline as they arrive
+			if err := pipe.write(data); err != nil {
+				if totalErrors.Add(1)%100 == 1 {
+					log.Printf("Warning: failed to write to ts-store: %v", err)
+				}
+				pipe.abandon()
+				pipe = nil
 			}
 		}
 
 		// Log stats every 60 seconds
 		if time.Since(lastStatsTime) > 60*time.Second {
-			log.Printf("Stats: sent=%d, errors=%d", totalSent, totalErrors)
+			log.Printf("Stats: sent=%d, errors=%d", totalSent.Load(), totalErrors.Load())
 			lastStatsTime = time.Now()
 		}
 	}
 
+	// Wait for outstanding responses before exiting
+	if pipe != nil {
+		pipe.close()
+	}
+
 	cmd.Wait()
 }
 
+// lineBuffered reports whether a complete line is already waiting in reader.
+func lineBuffered(reader *bufio.Reader) bool {
+	buffered, _ := reader.Peek(reader.Buffered())
+	return bytes.IndexByte(buffered, '\n') >= 0
+}
+
 func convertEntry(entry JournalEntry) LogEntry {
 	// Parse timestamp (microseconds since epoch)
 	var timeStr string
@@ -273,20 +307,113 @@ func connectAndAuth(socketPath, storeName, apiKey string) (net.Conn, *bufio.Writ
 	return conn, writer, reader, nil
 }
 
-func writeToSocket(writer *bufio.Writer, reader *bufio.Reader, data []byte) error {
-	fmt.Fprintf(writer, "%s\n", string(data))
-	writer.Flush()
+// pipeline writes entries to the socket without waiting for each response.
+// Responses are read in the background, so the next journal entry is parsed
+// while earlier ones are in flight. At most maxInFlight are unacknowledged.
+type pipeline struct {
+	conn     net.Conn
+	writer   *bufio.Writer
+	inFlight chan struct{}
+	done     chan struct{} // closed when the response reader stops
+	sent     *atomic.Int64
+	errors   *atomic.Int64
+}
 
-	resp, err := reader.ReadString('\n')
-	if err != nil {
-		return err
+func newPipeline(conn net.Conn, writer *bufio.Writer, reader *bufio.Reader, sent, errors *atomic.Int64) *pipeline {
+	p := &pipeline{
+		conn:     conn,
+		writer:   writer,
+		inFlight: make(chan struct{}, maxInFlight),
+		done:     make(chan struct{}),
+		sent:     sent,
+		errors:   errors,
 	}
-	if !strings.HasPrefix(resp, "OK") {
-		return fmt.Errorf("put failed: %s", strings.TrimSpace(resp))
+	go p.readResponses(reader)
+	return p
+}
+
+// readResponses matches responses to in-flight entries until the connection closes.
+func (p *pipeline) readResponses(reader *bufio.Reader) {
+	defer close(p.done)
+
+	for {
+		// ReadSlice reuses the reader's buffer; only failures are copied out
+		resp, err := reader.ReadSlice('\n')
+		if err != nil {
+			return
+		}
+		<-p.inFlight
+
+		if bytes.HasPrefix(resp, okPrefix) {
+			p.sent.Add(1)
+		} else if p.errors.Add(1)%100 == 1 {
+			log.Printf("Warning: failed to write to ts-store: %s", bytes.TrimSpace(resp))
+		}
+	}
+}
+
+// write queues one entry, blocking while maxInFlight entries are unacknowledged.
+// Queued entries are sent by flush, or when the write buffer fills.
+func (p *pipeline) write(data []byte) error {
+	select {
+	case p.inFlight <- struct{}{}:
+	default:
+		// Send what is queued before waiting on its responses
+		if err := p.writer.Flush(); err != nil {
+			return err
+		}
+		select {
+		case p.inFlight <- struct{}{}:
+		case <-p.done:
+			return fmt.Errorf("connection closed")
+		}
+	}
+
+	p.writer.Write(data)
+	if err := p.writer.WriteByte('\n'); err != nil {
+		// The caller counts this entry itself
+		<-p.inFlight
+		return err
 	}
 	return nil
 }
 
+// flush sends all queued entries in one write.
+func (p *pipeline) flush() error {
+	return p.writer.Flush()
+}
+
+// close waits for all in-flight responses, then closes the connection.
+func (p *pipeline) close() {
+	p.flush()
+
+drain:
+	for i := 0; i < maxInFlight; i++ {
+		select {
+		case p.inFlight <- struct{}{}:
+		case <-p.done:
+			break drain
+		}
+	}
+	p.conn.Close()
+	<-p.done
+}
+
+// abandon closes a failed connection and counts the entries still awaiting
+// a response as errors, since they may not have been stored.
+func (p *pipeline) abandon() {
+	p.conn.Close()
+	<-p.done
+
+	if lost := int64(len(p.inFlight)); lost > 0 {
+		p.errors.Add(lost)
+		log.Printf("Warning: %d entries lost with the ts-store connection", lost)
+	}
+}
+
+// httpClient is shared so keep-alive connections are reused across writes
+var httpClient = &http.Client{Timeout: 10 * time.Second}
+
 func writeToHTTP(httpURL, storeName, apiKey string, data []byte) error {
 	url := fmt.Sprintf("%s/api/stores/%s/data", httpURL, storeName)
 
@@ -304,13 +431,15 @@ func writeToHTTP(httpURL, storeName, apiKey string, data []byte) error {
 	req.Header.Set("Content-Type", "application/json")
 	req.Header.Set("X-API-Key", apiKey)
 
-	client := &http.Client{Timeout: 10 * time.Second}
-	resp, err := client.Do(req)
+	resp, err := httpClient.Do(req)
 	if err != nil {
 		return err
 	}
 	defer resp.Body.Close()
 
+	// Drain the body so the connection can be reused for the next write
+	io.Copy(io.Discard, resp.Body)
+
 	if resp.StatusCode != http.StatusOK && resp.StatusCode != http.StatusCreated {
 		return fmt.Errorf("unexpected status: %d", resp.StatusCode)
 	}
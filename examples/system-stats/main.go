@@ -14,15 +14,21 @@ package main
 import (
 	"bufio"
 	"bytes"
+	"context"
 	"encoding/json"
+	"errors"
 	"flag"
 	"fmt"
+	"io"
 	"log"
 	"net"
 	"net/http"
 	"os"
+	"os/signal"
+	"reflect"
 	"strconv"
 	"strings"
+	"syscall"
 	"time"
 )
 
@@ -43,6 +49,51 @@ type SystemStats struct {
 	DiskSpacePct        int   `json:"disk_space.pct"`
 }
 
+// statsKeys holds the pre-encoded JSON key prefix of each SystemStats field
+// ({"cpu.pct": then ,"memory.total": ...), built once from the struct tags.
+// compactStatsKeys uses the schema field indices (see README) instead, so
+// field names are not sent with every sample.
+var statsKeys, compactStatsKeys = buildStatsKeys()
+
+func buildStatsKeys() (full, compact [][]byte) {
+	t := reflect.TypeOf(SystemStats{})
+	for i := 0; i < t.NumField(); i++ {
+		sep := ","
+		if i == 0 {
+			sep = "{"
+		}
+		full = append(full, []byte(sep+strconv.Quote(t.Field(i).Tag.Get("json"))+":"))
+		compact = append(compact, []byte(sep+strconv.Quote(strconv.Itoa(i+1))+":"))
+	}
+	return full, compact
+}
+
+// appendJSON appends s as a JSON object to dst. Keys are pre-encoded and
+// values are all integers, so no reflection or escaping is needed.
+func (s *SystemStats) appendJSON(dst []byte, keys [][]byte) []byte {
+	// Same order as the struct fields
+	values := [...]int64{
+		int64(s.CPUPct),
+		s.MemoryTotal,
+		s.MemoryUsed,
+		s.MemoryAvailable,
+		int64(s.MemoryPct),
+		s.DiskIOReadByteSec,
+		s.DiskIOWriteByteSec,
+		s.NetworkRxByteSec,
+		s.NetworkTxByteSec,
+		s.DiskSpaceTotal,
+		s.DiskSpaceUsed,
+		s.DiskSpaceAvailable,
+		int64(s.DiskSpacePct),
+	}
+	for i, v := range values {
+		dst = append(dst, keys[i]...)
+		dst = strconv.AppendInt(dst, v, 10)
+	}
+	return append(dst, '}')
+}
+
 // MemoryStats for internal use
 type MemoryStats struct {
 	Total     int64
@@ -74,55 +125,160 @@ type netIORaw struct {
 	txBytes int64
 }
 
-func readCPUStats() (cpuRaw, error) {
-	f, err := os.Open("/proc/stat")
+// procFile keeps a /proc file open and re-reads it from the start on each
+// sample, avoiding an open and close per read.
+type procFile struct {
+	f   *os.File
+	buf []byte
+}
+
+func openProcFile(path string) (*procFile, error) {
+	f, err := os.Open(path)
+	if err != nil {
+		return nil, err
+	}
+	return &procFile{f: f, buf: make([]byte, 8192)}, nil
+}
+
+// read returns the file's current contents. The result is only valid until
+// the next read; the buffer grows until the whole file fits in one read.
+func (pf *procFile) read() ([]byte, error) {
+	n := 0
+	for {
+		m, err := pf.f.ReadAt(pf.buf[n:], int64(n))
+		n += m
+		if err == io.EOF {
+			return pf.buf[:n], nil
+		}
+		if err != nil {
+			return nil, err
+		}
+		pf.buf = append(pf.buf, make([]byte, len(pf.buf))...)
+	}
+}
+
+// procHeadSize is how much readHead reads; enough for the aggregate cpu line
+// of /proc/stat.
+const procHeadSize = 512
+
+// readHead returns up to procHeadSize bytes from the start of the file using
+// one read call. Unlike ReadAt, which keeps reading until the buffer is full,
+// this leaves the rest of the file unread. The result is only valid until
+// the next read.
+func (pf *procFile) readHead() ([]byte, error) {
+	if _, err := pf.f.Seek(0, io.SeekStart); err != nil {
+		return nil, err
+	}
+	n, err := pf.f.Read(pf.buf[:procHeadSize])
+	if n == 0 && err != nil {
+		return nil, err
+	}
+	return pf.buf[:n], nil
+}
+
+// parseInts parses the unsigned decimal integers in b into dst, skipping
+// any other bytes, and returns how many were parsed.
+func parseInts(b []byte, dst []int64) int {
+	n := 0
+	for i := 0; i < len(b) && n < len(dst); {
+		if b[i] < '0' || b[i] > '9' {
+			i++
+			continue
+		}
+		var v int64
+		for ; i < len(b) && b[i] >= '0' && b[i] <= '9'; i++ {
+			v = v*10 + int64(b[i]-'0')
+		}
+		dst[n] = v
+		n++
+	}
+	return n
+}
+
+// procFiles holds the /proc files read on every sample
+type procFiles struct {
+	stat      *procFile
+	meminfo   *procFile
+	diskstats *procFile
+	netdev    *procFile
+}
+
+func openProcFiles() (*procFiles, error) {
+	var pf procFiles
+	for _, f := range []struct {
+		dst  **procFile
+		path string
+	}{
+		{&pf.stat, "/proc/stat"},
+		{&pf.meminfo, "/proc/meminfo"},
+		{&pf.diskstats, "/proc/diskstats"},
+		{&pf.netdev, "/proc/net/dev"},
+	} {
+		file, err := openProcFile(f.path)
+		if err != nil {
+			return nil, err
+		}
+		*f.dst = file
+	}
+	return &pf, nil
+}
+
+var (
+	cpuPrefix          = []byte("cpu ")
+	memTotalPrefix     = []byte("MemTotal:")
+	memAvailablePrefix = []byte("MemAvailable:")
+)
+
+// readCPUStats parses only the aggregate "cpu" line at the top of /proc/stat,
+// without reading the per-CPU lines that follow it.
+func readCPUStats(pf *procFile) (cpuRaw, error) {
+	data, err := pf.readHead()
 	if err != nil {
 		return cpuRaw{}, err
 	}
-	defer f.Close()
 
-	scanner := bufio.NewScanner(f)
-	if scanner.Scan() {
-		fields := strings.Fields(scanner.Text())
-		if len(fields) >= 8 && fields[0] == "cpu" {
-			var user, nice, system, idle, iowait, irq, softirq, steal int64
-			user, _ = strconv.ParseInt(fields[1], 10, 64)
-			nice, _ = strconv.ParseInt(fields[2], 10, 64)
-			system, _ = strconv.ParseInt(fields[3], 10, 64)
-			idle, _ = strconv.ParseInt(fields[4], 10, 64)
-			iowait, _ = strconv.ParseInt(fields[5], 10, 64)
-			irq, _ = strconv.ParseInt(fields[6], 10, 64)
-			softirq, _ = strconv.ParseInt(fields[7], 10, 64)
-			if len(fields) >= 9 {
-				steal, _ = strconv.ParseInt(fields[8], 10, 64)
+	if i := bytes.IndexByte(data, '\n'); i >= 0 {
+		data = data[:i]
+	}
+	if bytes.HasPrefix(data, cpuPrefix) {
+		// user nice system idle iowait irq softirq steal
+		var v [8]int64
+		if parseInts(data[len(cpuPrefix):], v[:]) >= 7 {
+			var total int64
+			for _, x := range v {
+				total += x
 			}
-			total := user + nice + system + idle + iowait + irq + softirq + steal
-			return cpuRaw{total: total, idle: idle}, nil
+			return cpuRaw{total: total, idle: v[3]}, nil
 		}
 	}
 	return cpuRaw{}, fmt.Errorf("failed to parse /proc/stat")
 }
 
-func readMemory() (MemoryStats, error) {
-	f, err := os.Open("/proc/meminfo")
+func readMemory(pf *procFile) (MemoryStats, error) {
+	data, err := pf.read()
 	if err != nil {
 		return MemoryStats{}, err
 	}
-	defer f.Close()
 
+	// Both fields are near the top; stop once they have been found
 	var total, available int64
-	scanner := bufio.NewScanner(f)
-	for scanner.Scan() {
-		line := scanner.Text()
-		fields := strings.Fields(line)
-		if len(fields) >= 2 {
-			val, _ := strconv.ParseInt(fields[1], 10, 64)
-			switch {
-			case strings.HasPrefix(line, "MemTotal:"):
-				total = val * 1024 // Convert KB to bytes
-			case strings.HasPrefix(line, "MemAvailable:"):
-				available = val * 1024
-			}
+	var val [1]int64
+	for found := 0; found < 2 && len(data) > 0; {
+		line := data
+		if i := bytes.IndexByte(data, '\n'); i >= 0 {
+			line, data = data[:i], data[i+1:]
+		} else {
+			data = nil
+		}
+		switch {
+		case bytes.HasPrefix(line, memTotalPrefix):
+			parseInts(line[len(memTotalPrefix):], val[:])
+			total = val[0] * 1024 // Convert KB to bytes
+			found++
+		case bytes.HasPrefix(line, memAvailablePrefix):
+			parseInts(line[len(memAvailablePrefix):], val[:])
+			available = val[0] * 1024
+			found++
 		}
 	}
 
@@ -140,15 +296,14 @@ func readMemory() (MemoryStats, error) {
 	}, nil
 }
 
-func readDiskIO() (diskIORaw, error) {
-	f, err := os.Open("/proc/diskstats")
+func readDiskIO(pf *procFile) (diskIORaw, error) {
+	data, err := pf.read()
 	if err != nil {
 		return diskIORaw{}, err
 	}
-	defer f.Close()
 
 	var readSectors, writeSectors int64
-	scanner := bufio.NewScanner(f)
+	scanner := bufio.NewScanner(bytes.NewReader(data))
 	for scanner.Scan() {
 		fields := strings.Fields(scanner.Text())
 		if len(fields) >= 14 {
@@ -187,15 +342,14 @@ func isBlockDevice(dev string) bool {
 	return false
 }
 
-func readNetIO() (netIORaw, error) {
-	f, err := os.Open("/proc/net/dev")
+func readNetIO(pf *procFile) (netIORaw, error) {
+	data, err := pf.read()
 	if err != nil {
 		return netIORaw{}, err
 	}
-	defer f.Close()
 
 	var rxBytes, txBytes int64
-	scanner := bufio.NewScanner(f)
+	scanner := bufio.NewScanner(bytes.NewReader(data))
 	for scanner.Scan() {
 		line := scanner.Text()
 		if !strings.Contains(line, ":") {
@@ -222,42 +376,162 @@ func readNetIO() (netIORaw, error) {
 	return netIORaw{rxBytes: rxBytes, txBytes: txBytes}, nil
 }
 
-func writeToSocket(socketPath, storeName, apiKey string, data []byte) error {
-	conn, err := net.Dial("unix", socketPath)
+// sample is one encoded reading and the time it was taken
+type sample struct {
+	timestamp int64
+	data      []byte
+}
+
+// socketClient keeps one authenticated connection open across writes.
+// The connection is dropped on I/O errors and re-established on the next write.
+type socketClient struct {
+	socketPath string
+	storeName  string
+	apiKey     string
+	conn       net.Conn
+	writer     *bufio.Writer
+	reader     *bufio.Reader
+}
+
+var okPrefix = []byte("OK")
+
+func (c *socketClient) connect() error {
+	conn, err := net.Dial("unix", c.socketPath)
 	if err != nil {
 		return err
 	}
-	defer conn.Close()
 
-	// Auth first
-	fmt.Fprintf(conn, "AUTH %s %s\n", storeName, apiKey)
+	writer := bufio.NewWriter(conn)
 	reader := bufio.NewReader(conn)
-	resp, err := reader.ReadString('\n')
-	if err != nil {
+
+	// Auth first
+	fmt.Fprintf(writer, "AUTH %s %s\n", c.storeName, c.apiKey)
+	if err := writer.Flush(); err != nil {
+		conn.Close()
 		return err
 	}
-	if !strings.HasPrefix(resp, "OK") {
-		return fmt.Errorf("auth failed: %s", strings.TrimSpace(resp))
-	}
-
-	// Write data (just the JSON, no command prefix)
-	fmt.Fprintf(conn, "%s\n", string(data))
-	resp, err = reader.ReadString('\n')
+	resp, err := reader.ReadSlice('\n')
 	if err != nil {
+		conn.Close()
 		return err
 	}
-	if !strings.HasPrefix(resp, "OK") {
-		return fmt.Errorf("put failed: %s", strings.TrimSpace(resp))
+	if !bytes.HasPrefix(resp, okPrefix) {
+		conn.Close()
+		return fmt.Errorf("auth failed: %s", bytes.TrimSpace(resp))
 	}
 
+	c.conn, c.writer, c.reader = conn, writer, reader
 	return nil
 }
 
-func writeToHTTP(httpURL, storeName, apiKey string, data []byte) error {
+func (c *socketClient) close() {
+	if c.conn != nil {
+		c.conn.Close()
+		c.conn = nil
+	}
+}
+
+// maxHeldBatches bounds how many batches' worth of undelivered samples are
+// kept for retry while ts-store is unreachable
+const maxHeldBatches = 10
+
+// maxPipelined bounds how many lines are written before their responses are
+// read. The server stops reading once its unread responses fill the socket
+// buffer, so an unbounded batch written in one go would deadlock.
+const maxPipelined = 256
+
+// write sends a batch of samples in chunks of up to maxPipelined lines. Each
+// chunk goes out in one write, and its per-line responses are read back
+// before the next chunk is sent. It returns how many lines were answered;
+// the rest were not confirmed and may be resent. Lines the server rejected
+// are reported in the error with their count.
+func (c *socketClient) write(batch []sample) (int, error) {
+	if c.conn == nil {
+		if err := c.connect(); err != nil {
+			return 0, err
+		}
+	}
+
+	answered, rejected := 0, 0
+	var firstErr error
+	for start := 0; start < len(batch); start += maxPipelined {
+		end := min(start+maxPipelined, len(batch))
+
+		// Write data lines prefixed with the sample timestamp, formatting
+		// straight into the writer's free buffer space. The first line carries
+		// the full timestamp and the rest a "+<delta>" from the line before,
+		// which the server resolves against the previous line on the connection.
+		for i := start; i < end; i++ {
+			s := batch[i]
+			line := c.writer.AvailableBuffer()
+			if i > 0 && s.timestamp > batch[i-1].timestamp {
+				line = append(line, '+')
+				line = strconv.AppendInt(line, s.timestamp-batch[i-1].timestamp, 10)
+			} else {
+				line = strconv.AppendInt(line, s.timestamp, 10)
+			}
+			line = append(line, ' ')
+			line = append(line, s.data...)
+			c.writer.Write(append(line, '\n'))
+		}
+		if err := c.writer.Flush(); err != nil {
+			c.close()
+			return answered, err
+		}
+
+		// One response per line; keep the first failure as an example
+		for i := start; i < end; i++ {
+			resp, err := c.reader.ReadSlice('\n')
+			if err != nil {
+				c.close()
+				return answered, err
+			}
+			answered++
+			if !bytes.HasPrefix(resp, okPrefix) {
+				rejected++
+				if firstErr == nil {
+					firstErr = fmt.Errorf("%s", bytes.TrimSpace(resp))
+				}
+			}
+		}
+	}
+
+	if rejected > 0 {
+		return answered, fmt.Errorf("%w: %d of %d lines, first: %v", errRejected, rejected, len(batch), firstErr)
+	}
+	return answered, nil
+}
+
+// errRejected marks samples that ts-store answered with an error. They are
+// not resent, since sending them again would fail the same way.
+var errRejected = errors.New("put rejected")
+
+// requeue moves pending, a tail of batch, to the front of batch and of buf
+// so new samples can be appended after them. Sample data is copied within
+// buf, which is safe because each pending sample's data lies at or after
+// its new position.
+func requeue(batch, pending []sample, buf []byte) ([]sample, []byte) {
+	batch = batch[:copy(batch, pending)]
+	buf = buf[:0]
+	for i := range batch {
+		start := len(buf)
+		buf = append(buf, batch[i].data...)
+		batch[i].data = buf[start:]
+	}
+	return batch, buf
+}
+
+// httpClient is shared so keep-alive connections are reused across writes
+var httpClient = &http.Client{Timeout: 10 * time.Second}
+
+func writeToHTTP(httpURL, storeName, apiKey string, s sample) error {
 	url := fmt.Sprintf("%s/api/stores/%s/data", httpURL, storeName)
 
 	// Wrap data in expected format
-	body := map[string]json.RawMessage{"data": data}
+	body := struct {
+		Timestamp int64           `json:"timestamp"`
+		Data      json.RawMessage `json:"data"`
+	}{s.timestamp, s.data}
 	bodyBytes, err := json.Marshal(body)
 	if err != nil {
 		return err
@@ -270,15 +544,17 @@ func writeToHTTP(httpURL, storeName, apiKey string, data []byte) error {
 	req.Header.Set("Content-Type", "application/json")
 	req.Header.Set("X-API-Key", apiKey)
 
-	client := &http.Client{Timeout: 10 * time.Second}
-	resp, err := client.Do(req)
+	resp, err := httpClient.Do(req)
 	if err != nil {
 		return err
 	}
 	defer resp.Body.Close()
 
+	// Drain the body so the connection can be reused for the next write
+	io.Copy(io.Discard, resp.Body)
+
 	if resp.StatusCode != http.StatusOK && resp.StatusCode != http.StatusCreated {
-		return fmt.Errorf("unexpected status: %d", resp.StatusCode)
+		return fmt.Errorf("%w: unexpected status: %d", errRejected, resp.StatusCode)
 	}
 	return nil
 }
@@ -290,7 +566,12 @@ func main() {
 		storeName  = flag.String("store", "system-stats", "Store name")
 		apiKey     = flag.String("key", "", "API key for the store")
 		interval   = flag.Int("interval", 20, "Collection interval in seconds")
+		batchSize  = flag.Int("batch", 1, "Number of samples to buffer before writing")
+		flushAfter = flag.Int("flush", 0, "Max seconds to buffer samples before writing (0 = no limit)")
 		stdout     = flag.Bool("stdout", false, "Output to stdout instead of ts-store")
+		compact    = flag.Bool("compact", false, "Send schema field indices instead of names (schema stores only)")
+		cpu        = flag.Int("cpu", -1, "Pin the collector to this CPU (-1 = no pinning, Linux only)")
+		rtPriority = flag.Int("rt-priority", 0, "Run with SCHED_FIFO at this priority, 1-99 (0 = normal scheduling, Linux only)")
 	)
 	flag.Parse()
 
@@ -309,22 +590,42 @@ func main() {
 
 	useHTTP := *httpURL != ""
 
+	if *batchSize < 1 {
+		*batchSize = 1
+	}
+
+	// Reduce sampling jitter at high rates
+	if *cpu >= 0 {
+		if err := pinToCPU(*cpu); err != nil {
+			log.Fatalf("Failed to pin to CPU %d: %v", *cpu, err)
+		}
+	}
+	if *rtPriority > 0 {
+		if err := setRealtimePriority(*rtPriority); err != nil {
+			log.Fatalf("Failed to set realtime priority: %v", err)
+		}
+	}
+
+	// Keep the /proc files open across samples
+	proc, err := openProcFiles()
+	if err != nil {
+		log.Fatalf("Failed to open /proc files: %v", err)
+	}
+
 	// Initialize previous values
-	cpu1, err := readCPUStats()
+	cpu1, err := readCPUStats(proc.stat)
 	if err != nil {
 		log.Fatalf("Failed to read CPU stats: %v", err)
 	}
-	disk1, err := readDiskIO()
+	disk1, err := readDiskIO(proc.diskstats)
 	if err != nil {
 		log.Fatalf("Failed to read disk IO: %v", err)
 	}
-	net1, err := readNetIO()
+	net1, err := readNetIO(proc.netdev)
 	if err != nil {
 		log.Fatalf("Failed to read network IO: %v", err)
 	}
-
-	ticker := time.NewTicker(time.Duration(*interval) * time.Second)
-	defer ticker.Stop()
+	prevTime := time.Now()
 
 	log.Printf("Collecting system stats every %d seconds", *interval)
 	if *stdout {
@@ -334,25 +635,103 @@ func main() {
 	} else {
 		log.Printf("Output: %s (store: %s)", *socketPath, *storeName)
 	}
+	if *batchSize > 1 {
+		log.Printf("Batching %d samples per write", *batchSize)
+	}
+
+	client := &socketClient{socketPath: *socketPath, storeName: *storeName, apiKey: *apiKey}
+	defer client.close()
+
+	// Samples are encoded into one buffer that is reused for every batch
+	batch := make([]sample, 0, *batchSize)
+	batchBuf := make([]byte, 0, *batchSize*512)
+	var batchStart time.Time
+
+	// Samples that could not be delivered are kept for the next flush,
+	// up to this many; beyond that the oldest are dropped
+	maxHeld := maxHeldBatches * *batchSize
+
+	// flush writes the batch, keeping any samples that were not delivered
+	flush := func() {
+		sent := len(batch)
+		if useHTTP {
+			for i, s := range batch {
+				if err := writeToHTTP(*httpURL, *storeName, *apiKey, s); err != nil {
+					log.Printf("Warning: failed to write to ts-store: %v", err)
+					if !errors.Is(err, errRejected) {
+						sent = i
+						break
+					}
+				}
+			}
+		} else {
+			n, err := client.write(batch)
+			if err != nil {
+				log.Printf("Warning: failed to write to ts-store: %v", err)
+			}
+			sent = n
+		}
+
+		pending := batch[sent:]
+		if dropped := len(pending) - maxHeld; dropped > 0 {
+			log.Printf("Warning: dropping %d undelivered samples", dropped)
+			pending = pending[dropped:]
+		}
+		if len(pending) > 0 {
+			log.Printf("Holding %d undelivered samples for retry", len(pending))
+		}
+		batch, batchBuf = requeue(batch, pending, batchBuf)
+	}
+
+	// Send buffered samples before exiting on SIGINT or SIGTERM
+	ctx, stop := signal.NotifyContext(context.Background(), syscall.SIGINT, syscall.SIGTERM)
+	defer stop()
+	shutdown := func() {
+		log.Printf("Shutting down")
+		if len(batch) > 0 && !*stdout {
+			flush()
+		}
+	}
+
+	// Start on an interval boundary so samples land on a uniform
+	// wall-clock grid, e.g. :00, :20, :40 for a 20 second interval
+	period := time.Duration(*interval) * time.Second
+	select {
+	case <-time.After(time.Until(time.Now().Truncate(period).Add(period))):
+	case <-ctx.Done():
+		shutdown()
+		return
+	}
+	ticker := time.NewTicker(period)
+	defer ticker.Stop()
+
+	for {
+		var tick time.Time
+		select {
+		case tick = <-ticker.C:
+		case <-ctx.Done():
+			shutdown()
+			return
+		}
 
-	for range ticker.C {
 		// Read current values
-		cpu2, err := readCPUStats()
+		now := time.Now()
+		cpu2, err := readCPUStats(proc.stat)
 		if err != nil {
 			log.Printf("Warning: failed to read CPU stats: %v", err)
 			continue
 		}
-		disk2, err := readDiskIO()
+		disk2, err := readDiskIO(proc.diskstats)
 		if err != nil {
 			log.Printf("Warning: failed to read disk IO: %v", err)
 			continue
 		}
-		net2, err := readNetIO()
+		net2, err := readNetIO(proc.netdev)
 		if err != nil {
 			log.Printf("Warning: failed to read network IO: %v", err)
 			continue
 		}
-		memory, err := readMemory()
+		memory, err := readMemory(proc.meminfo)
 		if err != nil {
 			log.Printf("Warning: failed to read memory: %v", err)
 			continue
@@ -366,12 +745,13 @@ func main() {
 			cpuPct = int((totalDelta - idleDelta) * 100 / totalDelta)
 		}
 
-		// Calculate rates
-		intervalSec := int64(*interval)
-		diskReadRate := (disk2.readBytes - disk1.readBytes) / intervalSec
-		diskWriteRate := (disk2.writeBytes - disk1.writeBytes) / intervalSec
-		netRxRate := (net2.rxBytes - net1.rxBytes) / intervalSec
-		netTxRate := (net2.txBytes - net1.txBytes) / intervalSec
+		// Calculate rates over the measured time since the last sample,
+		// which stays correct if a tick was delayed or dropped
+		elapsed := now.Sub(prevTime).Seconds()
+		diskReadRate := int64(float64(disk2.readBytes-disk1.readBytes) / elapsed)
+		diskWriteRate := int64(float64(disk2.writeBytes-disk1.writeBytes) / elapsed)
+		netRxRate := int64(float64(net2.rxBytes-net1.rxBytes) / elapsed)
+		netTxRate := int64(float64(net2.txBytes-net1.txBytes) / elapsed)
 
 		// Get disk space
 		diskSpace := readDiskSpace()
@@ -392,21 +772,29 @@ func main() {
 			DiskSpacePct:       diskSpace.Pct,
 		}
 
-		data, err := json.Marshal(stats)
-		if err != nil {
-			log.Printf("Warning: failed to marshal stats: %v", err)
-			continue
+		keys := statsKeys
+		if *compact {
+			keys = compactStatsKeys
 		}
+		start := len(batchBuf)
+		batchBuf = stats.appendJSON(batchBuf, keys)
+		data := batchBuf[start:]
 
 		if *stdout {
-			fmt.Println(string(data))
-		} else if useHTTP {
-			if err := writeToHTTP(*httpURL, *storeName, *apiKey, data); err != nil {
-				log.Printf("Warning: failed to write to ts-store: %v", err)
-			}
+			fmt.Printf("%s\n", data)
+			batchBuf = batchBuf[:0]
 		} else {
-			if err := writeToSocket(*socketPath, *storeName, *apiKey, data); err != nil {
-				log.Printf("Warning: failed to write to ts-store: %v", err)
+			if len(batch) == 0 {
+				batchStart = time.Now()
+			}
+			// Stamp with the scheduled tick so timestamps stay evenly spaced
+			batch = append(batch, sample{timestamp: tick.UnixNano(), data: data})
+
+			// Write once the batch is full or has been held long enough
+			full := len(batch) >= *batchSize
+			stale := *flushAfter > 0 && time.Since(batchStart) >= time.Duration(*flushAfter)*time.Second
+			if full || stale {
+				flush()
 			}
 		}
 
@@ -414,5 +802,6 @@ func main() {
 		cpu1 = cpu2
 		disk1 = disk2
 		net1 = net2
+		prevTime = now
 	}
 }
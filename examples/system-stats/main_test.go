@@ -0,0 +1,173 @@
+// Copyright (c) 2026 TRV Enterprises LLC
+// SPDX-License-Identifier: Apache-2.0
+// See LICENSE file for details.
+
+package main
+
+import (
+	"bufio"
+	"encoding/json"
+	"errors"
+	"net"
+	"path/filepath"
+	"reflect"
+	"strconv"
+	"strings"
+	"testing"
+)
+
+// distinctStats returns SystemStats with a different value in every field,
+// so a value written under the wrong key is detected.
+func distinctStats() SystemStats {
+	var stats SystemStats
+	v := reflect.ValueOf(&stats).Elem()
+	for i := 0; i < v.NumField(); i++ {
+		v.Field(i).SetInt(int64(i+1) * 1000003)
+	}
+	return stats
+}
+
+func TestAppendJSONMatchesMarshal(t *testing.T) {
+	stats := distinctStats()
+
+	want, err := json.Marshal(stats)
+	if err != nil {
+		t.Fatalf("Marshal failed: %v", err)
+	}
+	if got := stats.appendJSON(nil, statsKeys); string(got) != string(want) {
+		t.Errorf("appendJSON does not match json.Marshal:\n got %s\nwant %s", got, want)
+	}
+}
+
+func TestAppendJSONCompactIndices(t *testing.T) {
+	stats := distinctStats()
+
+	var compact map[string]int64
+	if err := json.Unmarshal(stats.appendJSON(nil, compactStatsKeys), &compact); err != nil {
+		t.Fatalf("Compact output is not valid JSON: %v", err)
+	}
+
+	v := reflect.ValueOf(stats)
+	if len(compact) != v.NumField() {
+		t.Fatalf("Expected %d compact fields, got %d", v.NumField(), len(compact))
+	}
+	for i := 0; i < v.NumField(); i++ {
+		key := strconv.Itoa(i + 1)
+		if compact[key] != v.Field(i).Int() {
+			t.Errorf("Field %s: expected %d under key %s, got %d",
+				v.Type().Field(i).Name, v.Field(i).Int(), key, compact[key])
+		}
+	}
+}
+
+func TestRequeue(t *testing.T) {
+	var buf []byte
+	var batch []sample
+	for i, data := range []string{`{"a":1}`, `{"a":22}`, `{"a":333}`} {
+		start := len(buf)
+		buf = append(buf, data...)
+		batch = append(batch, sample{timestamp: int64(i + 1), data: buf[start:]})
+	}
+
+	batch, buf = requeue(batch, batch[1:], buf)
+	if len(batch) != 2 || string(buf) != `{"a":22}{"a":333}` {
+		t.Fatalf("Unexpected requeue result: %d samples, buffer %s", len(batch), buf)
+	}
+	if batch[0].timestamp != 2 || string(batch[0].data) != `{"a":22}` {
+		t.Errorf("Unexpected first sample: %d %s", batch[0].timestamp, batch[0].data)
+	}
+	if batch[1].timestamp != 3 || string(batch[1].data) != `{"a":333}` {
+		t.Errorf("Unexpected second sample: %d %s", batch[1].timestamp, batch[1].data)
+	}
+
+	// New samples append after the requeued ones without overwriting them
+	buf = append(buf, `{"a":4}`...)
+	if string(batch[0].data) != `{"a":22}` || string(batch[1].data) != `{"a":333}` {
+		t.Errorf("Requeued data overwritten: %s %s", batch[0].data, batch[1].data)
+	}
+}
+
+// serveLines accepts one connection, answers AUTH, then answers each line
+// with respond until it returns "", at which point the connection is closed.
+func serveLines(t *testing.T, respond func(n int, line string) string) string {
+	t.Helper()
+
+	sock := filepath.Join(t.TempDir(), "test.sock")
+	ln, err := net.Listen("unix", sock)
+	if err != nil {
+		t.Fatalf("Failed to listen: %v", err)
+	}
+	t.Cleanup(func() { ln.Close() })
+
+	go func() {
+		conn, err := ln.Accept()
+		if err != nil {
+			return
+		}
+		defer conn.Close()
+
+		reader := bufio.NewReader(conn)
+		reader.ReadString('\n')
+		conn.Write([]byte("OK\n"))
+		for n := 0; ; n++ {
+			line, err := reader.ReadString('\n')
+			if err != nil {
+				return
+			}
+			resp := respond(n, strings.TrimSpace(line))
+			if resp == "" {
+				return
+			}
+			conn.Write([]byte(resp + "\n"))
+		}
+	}()
+
+	return sock
+}
+
+func TestSocketClientCountsRejected(t *testing.T) {
+	sock := serveLines(t, func(n int, line string) string {
+		if strings.Contains(line, "bad") {
+			return "ERROR invalid JSON"
+		}
+		return "OK 1"
+	})
+
+	c := &socketClient{socketPath: sock, storeName: "test", apiKey: "key"}
+	defer c.close()
+
+	batch := []sample{
+		{1, []byte(`bad`)}, {2, []byte(`{"a":2}`)}, {3, []byte(`bad`)},
+	}
+	answered, err := c.write(batch)
+	if answered != 3 {
+		t.Errorf("Expected 3 answered lines, got %d", answered)
+	}
+	if !errors.Is(err, errRejected) || !strings.Contains(err.Error(), "2 of 3 lines") {
+		t.Errorf("Expected rejection count in error, got %v", err)
+	}
+}
+
+func TestSocketClientReportsUnanswered(t *testing.T) {
+	// Connection drops after two responses
+	sock := serveLines(t, func(n int, line string) string {
+		if n == 2 {
+			return ""
+		}
+		return "OK 1"
+	})
+
+	c := &socketClient{socketPath: sock, storeName: "test", apiKey: "key"}
+	defer c.close()
+
+	batch := []sample{
+		{1, []byte(`{"a":1}`)}, {2, []byte(`{"a":2}`)}, {3, []byte(`{"a":3}`)}, {4, []byte(`{"a":4}`)},
+	}
+	answered, err := c.write(batch)
+	if err == nil || errors.Is(err, errRejected) {
+		t.Errorf("Expected connection error, got %v", err)
+	}
+	if answered != 2 {
+		t.Errorf("Expected 2 answered lines, got %d", answered)
+	}
+}
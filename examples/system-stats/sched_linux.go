@@ -0,0 +1,65 @@
+// Copyright (c) 2026 TRV Enterprises LLC
+// SPDX-License-Identifier: Apache-2.0
+
+//go:build linux
+
+package main
+
+import (
+	"fmt"
+	"os"
+	"strconv"
+	"syscall"
+	"unsafe"
+)
+
+const schedFIFO = 1
+
+// pinToCPU restricts every thread of the process to one CPU. Threads the Go
+// runtime starts later inherit the mask from the thread that creates them.
+func pinToCPU(cpu int) error {
+	var mask [16]uint64 // 1024 CPUs, the kernel's default cpu_set_t size
+	if cpu < 0 || cpu >= len(mask)*64 {
+		return fmt.Errorf("invalid CPU %d", cpu)
+	}
+	mask[cpu/64] |= 1 << (uint(cpu) % 64)
+
+	return forEachThread(func(tid int) syscall.Errno {
+		_, _, errno := syscall.RawSyscall(syscall.SYS_SCHED_SETAFFINITY,
+			uintptr(tid), unsafe.Sizeof(mask), uintptr(unsafe.Pointer(&mask)))
+		return errno
+	})
+}
+
+// setRealtimePriority moves every thread to SCHED_FIFO at the given priority
+// (1-99), so sampling is not preempted by normal workloads. Requires root or
+// CAP_SYS_NICE.
+func setRealtimePriority(priority int) error {
+	param := struct{ priority int32 }{int32(priority)}
+
+	return forEachThread(func(tid int) syscall.Errno {
+		_, _, errno := syscall.RawSyscall(syscall.SYS_SCHED_SETSCHEDULER,
+			uintptr(tid), schedFIFO, uintptr(unsafe.Pointer(&param)))
+		return errno
+	})
+}
+
+// forEachThread applies fn to every thread of the current process.
+func forEachThread(fn func(tid int) syscall.Errno) error {
+	tasks, err := os.ReadDir("/proc/self/task")
+	if err != nil {
+		return err
+	}
+
+	for _, task := range tasks {
+		tid, err := strconv.Atoi(task.Name())
+		if err != nil {
+			continue
+		}
+		// ESRCH: the thread exited since the directory was read
+		if errno := fn(tid); errno != 0 && errno != syscall.ESRCH {
+			return errno
+		}
+	}
+	return nil
+}
@@ -0,0 +1,18 @@
+// Copyright (c) 2026 TRV Enterprises LLC
+// SPDX-License-Identifier: Apache-2.0
+
+//go:build !linux
+
+package main
+
+import "errors"
+
+// pinToCPU is a stub for non-Linux platforms.
+func pinToCPU(cpu int) error {
+	return errors.New("CPU pinning is only supported on Linux")
+}
+
+// setRealtimePriority is a stub for non-Linux platforms.
+func setRealtimePriority(priority int) error {
+	return errors.New("realtime scheduling is only supported on Linux")
+}
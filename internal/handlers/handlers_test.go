@@ -6,7 +6,9 @@ package handlers
 
 import (
 	"bytes"
+	"compress/gzip"
 	"encoding/json"
+	"io"
 	"net/http"
 	"net/http/httptest"
 	"testing"
@@ -53,7 +55,7 @@ func setupTestRouter(t *testing.T) (*gin.Engine, *service.StoreService, *apikey.
 	storeRoutes.GET("/stats", storeHandler.Stats)
 
 	data := storeRoutes.Group("/data")
-	data.POST("", unifiedHandler.Put)
+	data.POST("", middleware.DecompressRequest(middleware.DefaultMaxDecompressedSize), unifiedHandler.Put)
 	data.GET("/time/:timestamp", unifiedHandler.GetByTime)
 	data.DELETE("/time/:timestamp", unifiedHandler.DeleteByTime)
 	data.GET("/oldest", unifiedHandler.ListOldest)
@@ -390,3 +392,143 @@ func TestDeleteByTimestamp(t *testing.T) {
 		t.Errorf("Expected 404 after delete, got %d", w.Code)
 	}
 }
+
+func gzipBody(t *testing.T, body string) *bytes.Buffer {
+	t.Helper()
+
+	var buf bytes.Buffer
+	zw := gzip.NewWriter(&buf)
+	if _, err := zw.Write([]byte(body)); err != nil {
+		t.Fatalf("Failed to compress body: %v", err)
+	}
+	if err := zw.Close(); err != nil {
+		t.Fatalf("Failed to compress body: %v", err)
+	}
+	return &buf
+}
+
+func TestInsertGzipJSON(t *testing.T) {
+	router, storeService, _, _ := setupTestRouter(t)
+	defer storeService.CloseAll()
+
+	// Create a store
+	body := `{"name": "gzip-test"}`
+	req, _ := http.NewRequest("POST", "/api/stores", bytes.NewBufferString(body))
+	req.Header.Set("Content-Type", "application/json")
+	w := httptest.NewRecorder()
+	router.ServeHTTP(w, req)
+
+	var createResp service.CreateStoreResponse
+	json.Unmarshal(w.Body.Bytes(), &createResp)
+
+	// Insert gzip-compressed JSON data
+	insertBody := gzipBody(t, `{"timestamp": 1000000000, "data": {"message": "compressed"}}`)
+	req, _ = http.NewRequest("POST", "/api/stores/gzip-test/data", insertBody)
+	req.Header.Set("Content-Type", "application/json")
+	req.Header.Set("Content-Encoding", "gzip")
+	req.Header.Set("X-API-Key", createResp.APIKey)
+	w = httptest.NewRecorder()
+	router.ServeHTTP(w, req)
+
+	if w.Code != http.StatusCreated {
+		t.Fatalf("Gzip insert failed: %d: %s", w.Code, w.Body.String())
+	}
+
+	// Retrieve by timestamp
+	req, _ = http.NewRequest("GET", "/api/stores/gzip-test/data/time/1000000000", nil)
+	req.Header.Set("X-API-Key", createResp.APIKey)
+	w = httptest.NewRecorder()
+	router.ServeHTTP(w, req)
+
+	if w.Code != http.StatusOK {
+		t.Fatalf("Get by time failed: %d: %s", w.Code, w.Body.String())
+	}
+
+	var dataResp DataResponse
+	json.Unmarshal(w.Body.Bytes(), &dataResp)
+
+	dataBytes, _ := json.Marshal(dataResp.Data)
+	var msg map[string]string
+	json.Unmarshal(dataBytes, &msg)
+	if msg["message"] != "compressed" {
+		t.Errorf("Data mismatch: got %v", dataResp.Data)
+	}
+}
+
+func TestInsertUnsupportedEncoding(t *testing.T) {
+	router, storeService, _, _ := setupTestRouter(t)
+	defer storeService.CloseAll()
+
+	// Create a store
+	body := `{"name": "encoding-test"}`
+	req, _ := http.NewRequest("POST", "/api/stores", bytes.NewBufferString(body))
+	req.Header.Set("Content-Type", "application/json")
+	w := httptest.NewRecorder()
+	router.ServeHTTP(w, req)
+
+	var createResp service.CreateStoreResponse
+	json.Unmarshal(w.Body.Bytes(), &createResp)
+
+	insertBody := `{"timestamp": 1000000000, "data": {"message": "hello"}}`
+	req, _ = http.NewRequest("POST", "/api/stores/encoding-test/data", bytes.NewBufferString(insertBody))
+	req.Header.Set("Content-Type", "application/json")
+	req.Header.Set("Content-Encoding", "br")
+	req.Header.Set("X-API-Key", createResp.APIKey)
+	w = httptest.NewRecorder()
+	router.ServeHTTP(w, req)
+
+	if w.Code != http.StatusUnsupportedMediaType {
+		t.Errorf("Expected 415 for unsupported encoding, got %d: %s", w.Code, w.Body.String())
+	}
+}
+
+func TestInsertCorruptGzip(t *testing.T) {
+	router, storeService, _, _ := setupTestRouter(t)
+	defer storeService.CloseAll()
+
+	// Create a store
+	body := `{"name": "corrupt-test"}`
+	req, _ := http.NewRequest("POST", "/api/stores", bytes.NewBufferString(body))
+	req.Header.Set("Content-Type", "application/json")
+	w := httptest.NewRecorder()
+	router.ServeHTTP(w, req)
+
+	var createResp service.CreateStoreResponse
+	json.Unmarshal(w.Body.Bytes(), &createResp)
+
+	// Body claims gzip but is plain JSON
+	insertBody := `{"timestamp": 1000000000, "data": {"message": "hello"}}`
+	req, _ = http.NewRequest("POST", "/api/stores/corrupt-test/data", bytes.NewBufferString(insertBody))
+	req.Header.Set("Content-Type", "application/json")
+	req.Header.Set("Content-Encoding", "gzip")
+	req.Header.Set("X-API-Key", createResp.APIKey)
+	w = httptest.NewRecorder()
+	router.ServeHTTP(w, req)
+
+	if w.Code != http.StatusBadRequest {
+		t.Errorf("Expected 400 for corrupt gzip body, got %d: %s", w.Code, w.Body.String())
+	}
+}
+
+func TestDecompressRequestLimit(t *testing.T) {
+	gin.SetMode(gin.TestMode)
+
+	router := gin.New()
+	router.POST("/", middleware.DecompressRequest(16), func(c *gin.Context) {
+		if _, err := io.ReadAll(c.Request.Body); err != nil {
+			c.Status(http.StatusRequestEntityTooLarge)
+			return
+		}
+		c.Status(http.StatusOK)
+	})
+
+	// A small compressed body that expands well past the limit
+	req, _ := http.NewRequest("POST", "/", gzipBody(t, string(bytes.Repeat([]byte("a"), 1024))))
+	req.Header.Set("Content-Encoding", "gzip")
+	w := httptest.NewRecorder()
+	router.ServeHTTP(w, req)
+
+	if w.Code != http.StatusRequestEntityTooLarge {
+		t.Errorf("Expected decoded body over the limit to fail, got %d", w.Code)
+	}
+}
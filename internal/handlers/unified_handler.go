@@ -119,9 +119,8 @@ func (h *UnifiedHandler) Put(c *gin.Context) {
 			c.JSON(http.StatusBadRequest, gin.H{"error": "data is required"})
 			return
 		}
-		// Validate JSON
-		var js json.RawMessage
-		if err := json.Unmarshal(req.Data, &js); err != nil {
+		// Validate JSON; the binder may not check raw values
+		if !json.Valid(req.Data) {
 			c.JSON(http.StatusBadRequest, gin.H{"error": "invalid JSON data"})
 			return
 		}
@@ -615,20 +614,14 @@ func (h *UnifiedHandler) aggregateAndRespond(c *gin.Context, st *store.Store, ha
 			continue
 		}
 
-		// Expand to full field names for schema stores
-		var jsonData []byte
+		// Decode once; schema stores map indices straight to field names
+		var parsed map[string]interface{}
 		if dataType == store.DataTypeSchema {
-			expanded, err := st.ExpandData(rawData, 0)
-			if err != nil {
-				continue
-			}
-			jsonData = expanded
+			parsed, err = st.DecodeData(rawData, 0)
 		} else {
-			jsonData = rawData
+			err = json.Unmarshal(rawData, &parsed)
 		}
-
-		var parsed map[string]interface{}
-		if err := json.Unmarshal(jsonData, &parsed); err != nil {
+		if err != nil {
 			continue
 		}
 
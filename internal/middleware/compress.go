@@ -0,0 +1,50 @@
+// Copyright (c) 2026 TRV Enterprises LLC
+// SPDX-License-Identifier: Apache-2.0
+// See LICENSE file for details.
+
+package middleware
+
+import (
+	"compress/gzip"
+	"net/http"
+	"strings"
+
+	"github.com/gin-gonic/gin"
+)
+
+// DefaultMaxDecompressedSize bounds a decoded request body (32 MB).
+const DefaultMaxDecompressedSize = 32 << 20
+
+// DecompressRequest creates middleware that decodes request bodies sent with
+// Content-Encoding: gzip, so remote writers can compress large payloads.
+// Reading more than maxSize decoded bytes fails, so a small compressed body
+// cannot expand without bound. Uncompressed requests pass through unchanged.
+func DecompressRequest(maxSize int64) gin.HandlerFunc {
+	return func(c *gin.Context) {
+		switch strings.ToLower(c.GetHeader("Content-Encoding")) {
+		case "", "identity":
+			c.Next()
+			return
+		case "gzip":
+		default:
+			c.JSON(http.StatusUnsupportedMediaType, gin.H{"error": "unsupported content encoding, use gzip"})
+			c.Abort()
+			return
+		}
+
+		zr, err := gzip.NewReader(c.Request.Body)
+		if err != nil {
+			c.JSON(http.StatusBadRequest, gin.H{"error": "invalid gzip body"})
+			c.Abort()
+			return
+		}
+		defer zr.Close()
+
+		// Handlers see the decoded body as if it had been sent uncompressed
+		c.Request.Body = http.MaxBytesReader(c.Writer, zr, maxSize)
+		c.Request.Header.Del("Content-Encoding")
+		c.Request.ContentLength = -1
+
+		c.Next()
+	}
+}
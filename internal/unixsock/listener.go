@@ -7,20 +7,28 @@ package unixsock
 
 import (
 	"bufio"
+	"bytes"
 	"encoding/json"
 	"fmt"
 	"log"
+	"math"
 	"net"
 	"os"
 	"path/filepath"
+	"strconv"
 	"strings"
 	"sync"
 	"time"
 
 	"github.com/tviviano/ts-store/internal/apikey"
 	"github.com/tviviano/ts-store/internal/service"
+	"github.com/tviviano/ts-store/pkg/store"
 )
 
+// writeTimeout bounds how long a response write may block on a client that
+// has stopped reading, so a stalled connection cannot hold up Stop.
+var writeTimeout = 10 * time.Second
+
 // Listener manages Unix socket connections for data ingestion.
 type Listener struct {
 	socketPath   string
@@ -119,11 +127,17 @@ func (l *Listener) acceptLoop() {
 // Connection protocol:
 // 1. Client sends: AUTH <store-name> <api-key>\n
 // 2. Server responds: OK\n or ERROR <message>\n
-// 3. Client sends data lines: {"field": "value"}\n
+// 3. Client sends data lines: {"field": "value"}\n or <timestamp> {"field": "value"}\n
 // 4. Server responds per line: OK <timestamp>\n or ERROR <message>\n
 //
+// A later AUTH line switches the connection to another store, so one client
+// can feed several stores over a single socket. If it fails, the connection
+// keeps writing to the current store.
+//
 // For schema stores, send full JSON and it will be auto-compacted.
-// Timestamps are auto-generated (current time in nanoseconds).
+// Lines without a timestamp prefix (nanoseconds) get the current time.
+// Clients may write several lines before reading the responses, but must
+// read them before the socket buffer fills; see writeTimeout.
 
 func (l *Listener) handleConnection(conn net.Conn) {
 	defer l.wg.Done()
@@ -132,41 +146,32 @@ func (l *Listener) handleConnection(conn net.Conn) {
 	reader := bufio.NewReader(conn)
 	writer := bufio.NewWriter(conn)
 
+	// Responses may be held while more lines are pending; send them on
+	// every exit, including shutdown, before the connection closes
+	defer writer.Flush()
+
 	// Read AUTH line
 	authLine, err := reader.ReadString('\n')
 	if err != nil {
 		return
 	}
-	authLine = strings.TrimSpace(authLine)
 
-	parts := strings.SplitN(authLine, " ", 3)
-	if len(parts) != 3 || strings.ToUpper(parts[0]) != "AUTH" {
-		writer.WriteString("ERROR invalid auth format, expected: AUTH <store> <api-key>\n")
-		writer.Flush()
-		return
-	}
-
-	storeName := parts[1]
-	apiKey := parts[2]
-
-	// Validate API key
-	if _, err := l.keyManager.Validate(storeName, apiKey); err != nil {
-		writer.WriteString("ERROR authentication failed\n")
-		writer.Flush()
-		return
-	}
-
-	// Get or open the store
-	st, err := l.storeService.GetOrOpen(storeName)
+	st, err := l.authenticate(strings.TrimSpace(authLine))
 	if err != nil {
-		writer.WriteString(fmt.Sprintf("ERROR failed to open store: %s\n", err.Error()))
-		writer.Flush()
+		writer.WriteString(fmt.Sprintf("ERROR %s\n", err.Error()))
 		return
 	}
 
 	writer.WriteString("OK\n")
 	writer.Flush()
 
+	// Resolved once per store rather than per line
+	isSchema := st.DataType() == store.DataTypeSchema
+
+	// Timestamp of the previous data line, the base for "+<delta>" prefixes
+	var prevTimestamp int64
+	hasPrev := false
+
 	// Process data lines
 	for {
 		select {
@@ -175,8 +180,16 @@ func (l *Listener) handleConnection(conn net.Conn) {
 		default:
 		}
 
-		// Set read deadline for interruptibility
+		// Set read deadline for interruptibility, and a write deadline so a
+		// client that never reads its responses is dropped
 		conn.SetReadDeadline(time.Now().Add(1 * time.Second))
+		conn.SetWriteDeadline(time.Now().Add(writeTimeout))
+
+		// Send responses once no complete line is waiting, so a pipelined
+		// batch is answered with a single write
+		if err := flushIfIdle(reader, writer); err != nil {
+			return
+		}
 
 		line, err := reader.ReadString('\n')
 		if err != nil {
@@ -192,30 +205,47 @@ func (l *Listener) handleConnection(conn net.Conn) {
 		}
 
 		// Handle QUIT command
-		if strings.ToUpper(line) == "QUIT" {
+		if strings.EqualFold(line, "QUIT") {
 			writer.WriteString("OK bye\n")
-			writer.Flush()
 			return
 		}
 
+		// Switch to another store on the same connection
+		if len(line) > 5 && strings.EqualFold(line[:5], "AUTH ") {
+			next, err := l.authenticate(line)
+			if err != nil {
+				writer.WriteString(fmt.Sprintf("ERROR %s\n", err.Error()))
+				continue
+			}
+			st = next
+			isSchema = st.DataType() == store.DataTypeSchema
+			writer.WriteString("OK\n")
+			continue
+		}
+
 		// Parse and store the data
-		timestamp := time.Now().UnixNano()
+		timestamp, line, err := parseDataLine(line, prevTimestamp, hasPrev)
+		if err != nil {
+			writer.WriteString(fmt.Sprintf("ERROR %s\n", err.Error()))
+			continue
+		}
+		prevTimestamp, hasPrev = timestamp, true
 
-		// Validate JSON
-		var js json.RawMessage
-		if err := json.Unmarshal([]byte(line), &js); err != nil {
+		// Validate JSON without building a value; decode only to describe
+		// the error
+		data := []byte(line)
+		if !json.Valid(data) {
+			var js json.RawMessage
+			err := json.Unmarshal(data, &js)
 			writer.WriteString(fmt.Sprintf("ERROR invalid JSON: %s\n", err.Error()))
-			writer.Flush()
 			continue
 		}
 
 		// For schema stores, validate and compact the data
-		data := []byte(line)
-		if st.DataType().String() == "schema" {
+		if isSchema {
 			compactData, err := st.ValidateAndCompact(data)
 			if err != nil {
 				writer.WriteString(fmt.Sprintf("ERROR schema validation failed: %s\n", err.Error()))
-				writer.Flush()
 				continue
 			}
 			data = compactData
@@ -225,13 +255,81 @@ func (l *Listener) handleConnection(conn net.Conn) {
 		handle, err := st.PutObject(timestamp, data)
 		if err != nil {
 			writer.WriteString(fmt.Sprintf("ERROR store failed: %s\n", err.Error()))
-			writer.Flush()
 			continue
 		}
 
-		writer.WriteString(fmt.Sprintf("OK %d\n", handle.Timestamp))
-		writer.Flush()
+		resp := append(writer.AvailableBuffer(), "OK "...)
+		resp = strconv.AppendInt(resp, handle.Timestamp, 10)
+		writer.Write(append(resp, '\n'))
+	}
+}
+
+// authenticate parses an AUTH line, validates the API key, and opens the store.
+func (l *Listener) authenticate(authLine string) (*store.Store, error) {
+	parts := strings.SplitN(authLine, " ", 3)
+	if len(parts) != 3 || strings.ToUpper(parts[0]) != "AUTH" {
+		return nil, fmt.Errorf("invalid auth format, expected: AUTH <store> <api-key>")
+	}
+
+	storeName := parts[1]
+	apiKey := parts[2]
+
+	// Validate API key
+	if _, err := l.keyManager.Validate(storeName, apiKey); err != nil {
+		return nil, fmt.Errorf("authentication failed")
+	}
+
+	// Get or open the store
+	st, err := l.storeService.GetOrOpen(storeName)
+	if err != nil {
+		return nil, fmt.Errorf("failed to open store: %s", err.Error())
+	}
+
+	return st, nil
+}
+
+// flushIfIdle flushes buffered responses unless another complete line has
+// already been received. It returns any write error.
+func flushIfIdle(reader *bufio.Reader, writer *bufio.Writer) error {
+	buffered, _ := reader.Peek(reader.Buffered())
+	if bytes.IndexByte(buffered, '\n') < 0 {
+		return writer.Flush()
+	}
+	return nil
+}
+
+// parseDataLine splits an optional leading timestamp from a data line.
+// No JSON value starts with digits (or '+') followed by a space, so a numeric
+// prefix is unambiguous. A "+<delta>" prefix is relative to prev, the
+// timestamp of the previous line on the connection, if hasPrev is set.
+// Lines without a prefix are stamped with the current time.
+func parseDataLine(line string, prev int64, hasPrev bool) (int64, string, error) {
+	start := 0
+	if len(line) > 0 && line[0] == '+' {
+		start = 1
+	}
+	i := start
+	for i < len(line) && line[i] >= '0' && line[i] <= '9' {
+		i++
+	}
+	if i == start || i == len(line) || line[i] != ' ' {
+		return time.Now().UnixNano(), line, nil
+	}
+
+	timestamp, err := strconv.ParseInt(line[start:i], 10, 64)
+	if err != nil {
+		return 0, "", fmt.Errorf("invalid timestamp: %s", line[:i])
+	}
+	if start == 1 {
+		if !hasPrev {
+			return 0, "", fmt.Errorf("delta timestamp without a previous timestamp: %s", line[:i])
+		}
+		if timestamp > math.MaxInt64-prev {
+			return 0, "", fmt.Errorf("invalid timestamp: %s overflows", line[:i])
+		}
+		timestamp += prev
 	}
+	return timestamp, strings.TrimSpace(line[i+1:]), nil
 }
 
 // SocketPath returns the path to the Unix socket.
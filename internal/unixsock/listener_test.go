@@ -0,0 +1,424 @@
+// Copyright (c) 2026 TRV Enterprises LLC
+// SPDX-License-Identifier: Apache-2.0
+// See LICENSE file for details.
+
+package unixsock
+
+import (
+	"bufio"
+	"fmt"
+	"math"
+	"net"
+	"path/filepath"
+	"strings"
+	"testing"
+	"time"
+
+	"github.com/tviviano/ts-store/internal/apikey"
+	"github.com/tviviano/ts-store/internal/config"
+	"github.com/tviviano/ts-store/internal/service"
+	"github.com/tviviano/ts-store/pkg/schema"
+	"github.com/tviviano/ts-store/pkg/store"
+)
+
+func setupTestListener(t *testing.T) (*Listener, *service.StoreService) {
+	t.Helper()
+
+	l, storeService := newTestListener(t)
+	t.Cleanup(func() { l.Stop() })
+
+	return l, storeService
+}
+
+// newTestListener starts a listener that the test must stop itself.
+func newTestListener(t *testing.T) (*Listener, *service.StoreService) {
+	t.Helper()
+
+	tmpDir := t.TempDir()
+
+	cfg := &config.Config{
+		Store: config.StoreConfig{
+			BasePath:       tmpDir,
+			DataBlockSize:  4096,
+			IndexBlockSize: 4096,
+			NumBlocks:      100,
+		},
+	}
+
+	keyManager := apikey.NewManager(tmpDir)
+	storeService := service.NewStoreService(cfg, keyManager)
+
+	l := NewListener(filepath.Join(tmpDir, "tsstore.sock"), storeService, keyManager)
+	if err := l.Start(); err != nil {
+		t.Fatalf("Failed to start listener: %v", err)
+	}
+
+	t.Cleanup(func() { storeService.CloseAll() })
+
+	return l, storeService
+}
+
+// createTestStore creates a store and returns its API key.
+func createTestStore(t *testing.T, storeService *service.StoreService, name, dataType string) string {
+	t.Helper()
+
+	resp, err := storeService.Create(&service.CreateStoreRequest{Name: name, DataType: dataType})
+	if err != nil {
+		t.Fatalf("Failed to create store %s: %v", name, err)
+	}
+	return resp.APIKey
+}
+
+// testConn sends lines over the socket and returns one response per line.
+type testConn struct {
+	t      *testing.T
+	conn   net.Conn
+	reader *bufio.Reader
+}
+
+func dialTestListener(t *testing.T, l *Listener) *testConn {
+	t.Helper()
+
+	conn, err := net.Dial("unix", l.SocketPath())
+	if err != nil {
+		t.Fatalf("Failed to connect: %v", err)
+	}
+	t.Cleanup(func() { conn.Close() })
+
+	return &testConn{t: t, conn: conn, reader: bufio.NewReader(conn)}
+}
+
+func (c *testConn) send(line string) string {
+	c.t.Helper()
+
+	if _, err := c.conn.Write([]byte(line + "\n")); err != nil {
+		c.t.Fatalf("Failed to write %q: %v", line, err)
+	}
+	resp, err := c.reader.ReadString('\n')
+	if err != nil {
+		c.t.Fatalf("Failed to read response to %q: %v", line, err)
+	}
+	return strings.TrimSpace(resp)
+}
+
+func countObjects(t *testing.T, storeService *service.StoreService, name string) int {
+	t.Helper()
+
+	st, err := storeService.GetOrOpen(name)
+	if err != nil {
+		t.Fatalf("Failed to open store %s: %v", name, err)
+	}
+	handles, err := st.GetObjectsInRange(0, math.MaxInt64, 100)
+	if err != nil {
+		t.Fatalf("Failed to list store %s: %v", name, err)
+	}
+	return len(handles)
+}
+
+func TestAuthSwitchRoutesToNewStore(t *testing.T) {
+	l, storeService := setupTestListener(t)
+	keyA := createTestStore(t, storeService, "store-a", "json")
+	keyB := createTestStore(t, storeService, "store-b", "json")
+
+	c := dialTestListener(t, l)
+	if resp := c.send("AUTH store-a " + keyA); resp != "OK" {
+		t.Fatalf("Expected OK for AUTH, got %q", resp)
+	}
+	if resp := c.send(`1000 {"v": 1}`); resp != "OK 1000" {
+		t.Fatalf("Expected OK 1000, got %q", resp)
+	}
+
+	if resp := c.send("AUTH store-b " + keyB); resp != "OK" {
+		t.Fatalf("Expected OK for AUTH switch, got %q", resp)
+	}
+	if resp := c.send(`2000 {"v": 2}`); resp != "OK 2000" {
+		t.Fatalf("Expected OK 2000, got %q", resp)
+	}
+	c.send("QUIT")
+
+	if n := countObjects(t, storeService, "store-a"); n != 1 {
+		t.Errorf("Expected 1 object in store-a, got %d", n)
+	}
+	if n := countObjects(t, storeService, "store-b"); n != 1 {
+		t.Errorf("Expected 1 object in store-b, got %d", n)
+	}
+}
+
+func TestAuthSwitchFailureKeepsStore(t *testing.T) {
+	l, storeService := setupTestListener(t)
+	keyA := createTestStore(t, storeService, "store-a", "json")
+	createTestStore(t, storeService, "store-b", "json")
+
+	c := dialTestListener(t, l)
+	if resp := c.send("AUTH store-a " + keyA); resp != "OK" {
+		t.Fatalf("Expected OK for AUTH, got %q", resp)
+	}
+
+	if resp := c.send("AUTH store-b tsstore_invalid"); !strings.HasPrefix(resp, "ERROR") {
+		t.Fatalf("Expected ERROR for bad AUTH switch, got %q", resp)
+	}
+	if resp := c.send(`3000 {"v": 3}`); resp != "OK 3000" {
+		t.Fatalf("Expected OK 3000 after failed switch, got %q", resp)
+	}
+	c.send("QUIT")
+
+	if n := countObjects(t, storeService, "store-a"); n != 1 {
+		t.Errorf("Expected 1 object in store-a, got %d", n)
+	}
+	if n := countObjects(t, storeService, "store-b"); n != 0 {
+		t.Errorf("Expected 0 objects in store-b, got %d", n)
+	}
+}
+
+func TestAuthSwitchFollowsSchemaType(t *testing.T) {
+	l, storeService := setupTestListener(t)
+	jsonKey := createTestStore(t, storeService, "plain", "json")
+	schemaKey := createTestStore(t, storeService, "sensors", "schema")
+
+	st, err := storeService.GetOrOpen("sensors")
+	if err != nil {
+		t.Fatalf("Failed to open schema store: %v", err)
+	}
+	_, err = st.SetSchema(&schema.Schema{
+		Fields: []schema.Field{
+			{Index: 1, Name: "temperature", Type: schema.FieldTypeFloat64},
+		},
+	})
+	if err != nil {
+		t.Fatalf("SetSchema failed: %v", err)
+	}
+	if st.DataType() != store.DataTypeSchema {
+		t.Fatalf("Expected schema store, got %s", st.DataType())
+	}
+
+	c := dialTestListener(t, l)
+	if resp := c.send("AUTH plain " + jsonKey); resp != "OK" {
+		t.Fatalf("Expected OK for AUTH, got %q", resp)
+	}
+	if resp := c.send(`{"unknown": 1}`); !strings.HasPrefix(resp, "OK") {
+		t.Fatalf("Expected JSON store to accept any object, got %q", resp)
+	}
+
+	// Switching to the schema store enables validation and compaction
+	if resp := c.send("AUTH sensors " + schemaKey); resp != "OK" {
+		t.Fatalf("Expected OK for AUTH switch, got %q", resp)
+	}
+	if resp := c.send(`{"unknown": 1}`); !strings.HasPrefix(resp, "ERROR schema validation failed") {
+		t.Fatalf("Expected schema validation error, got %q", resp)
+	}
+	if resp := c.send(`4000 {"temperature": 21.5}`); resp != "OK 4000" {
+		t.Fatalf("Expected OK 4000, got %q", resp)
+	}
+	data, _, err := st.GetObjectByTime(4000)
+	if err != nil {
+		t.Fatalf("GetObjectByTime failed: %v", err)
+	}
+	if string(data) != `{"1":21.5}` {
+		t.Errorf("Expected compact data, got %s", data)
+	}
+
+	// And switching back disables it
+	if resp := c.send("AUTH plain " + jsonKey); resp != "OK" {
+		t.Fatalf("Expected OK for AUTH switch back, got %q", resp)
+	}
+	if resp := c.send(`{"unknown": 2}`); !strings.HasPrefix(resp, "OK") {
+		t.Fatalf("Expected JSON store to accept any object, got %q", resp)
+	}
+	c.send("QUIT")
+}
+
+func TestParseDataLine(t *testing.T) {
+	const now = -1 // expect the current time
+
+	tests := []struct {
+		name     string
+		line     string
+		prev     int64
+		hasPrev  bool
+		wantTS   int64
+		wantLine string
+		wantErr  bool
+	}{
+		{"no prefix", `{"a": 1}`, 0, false, now, `{"a": 1}`, false},
+		{"bare number", `123`, 0, false, now, `123`, false},
+		{"absolute", `123 {"a": 1}`, 0, false, 123, `{"a": 1}`, false},
+		{"extra spaces", `123   {"a": 1}`, 0, false, 123, `{"a": 1}`, false},
+		{"zero", `0 {"a": 1}`, 0, false, 0, `{"a": 1}`, false},
+		{"number data", `1 2`, 0, false, 1, `2`, false},
+		{"delta", `+10 {"a": 1}`, 100, true, 110, `{"a": 1}`, false},
+		{"delta from zero", `+10 {"a": 1}`, 0, true, 10, `{"a": 1}`, false},
+		{"delta without previous", `+10 {"a": 1}`, 0, false, 0, "", true},
+		{"sign without digits", `+ {"a": 1}`, 100, true, now, `+ {"a": 1}`, false},
+		{"absolute overflow", `99999999999999999999 {"a": 1}`, 0, false, 0, "", true},
+		{"delta overflow", `+1 {"a": 1}`, math.MaxInt64, true, 0, "", true},
+	}
+
+	for _, tt := range tests {
+		t.Run(tt.name, func(t *testing.T) {
+			before := time.Now().UnixNano()
+			ts, line, err := parseDataLine(tt.line, tt.prev, tt.hasPrev)
+			after := time.Now().UnixNano()
+
+			if tt.wantErr {
+				if err == nil {
+					t.Errorf("Expected error, got timestamp %d", ts)
+				}
+				return
+			}
+			if err != nil {
+				t.Fatalf("Unexpected error: %v", err)
+			}
+			if line != tt.wantLine {
+				t.Errorf("Expected line %q, got %q", tt.wantLine, line)
+			}
+			if tt.wantTS == now {
+				if ts < before || ts > after {
+					t.Errorf("Expected current time, got %d", ts)
+				}
+			} else if ts != tt.wantTS {
+				t.Errorf("Expected timestamp %d, got %d", tt.wantTS, ts)
+			}
+		})
+	}
+}
+
+// stopWithin stops the listener and fails the test if Stop blocks.
+func stopWithin(t *testing.T, l *Listener, d time.Duration) {
+	t.Helper()
+
+	stopped := make(chan struct{})
+	go func() {
+		l.Stop()
+		close(stopped)
+	}()
+	select {
+	case <-stopped:
+	case <-time.After(d):
+		t.Fatalf("Stop did not return within %v", d)
+	}
+}
+
+func TestWriteTimeoutDropsStalledClient(t *testing.T) {
+	defer func(d time.Duration) { writeTimeout = d }(writeTimeout)
+	writeTimeout = 200 * time.Millisecond
+
+	l, storeService := newTestListener(t)
+	key := createTestStore(t, storeService, "stalled", "json")
+
+	c := dialTestListener(t, l)
+	if resp := c.send("AUTH stalled " + key); resp != "OK" {
+		t.Fatalf("Expected OK for AUTH, got %q", resp)
+	}
+
+	// Each short invalid line produces a long ERROR response, so the
+	// responses overflow the socket buffer while the client never reads
+	batch := strings.Repeat("x\n", 50000)
+	go c.conn.Write([]byte(batch))
+
+	// Only start reading once the server has given up on the stalled
+	// writes; it should then have closed the connection
+	time.Sleep(5 * writeTimeout)
+	c.conn.SetReadDeadline(time.Now().Add(10 * time.Second))
+	var err error
+	for err == nil {
+		_, err = c.reader.ReadString('\n')
+	}
+	if netErr, ok := err.(net.Error); ok && netErr.Timeout() {
+		t.Fatal("Expected the server to close the connection")
+	}
+
+	stopWithin(t, l, 5*time.Second)
+}
+
+func TestPipelinedResponsesInOrder(t *testing.T) {
+	l, storeService := setupTestListener(t)
+	key := createTestStore(t, storeService, "pipelined", "json")
+
+	c := dialTestListener(t, l)
+	if resp := c.send("AUTH pipelined " + key); resp != "OK" {
+		t.Fatalf("Expected OK for AUTH, got %q", resp)
+	}
+
+	// All lines and QUIT in one write; one line is invalid
+	const n = 300
+	const bad = 150
+	var batch strings.Builder
+	for i := 1; i <= n; i++ {
+		if i == bad {
+			batch.WriteString("not json\n")
+			continue
+		}
+		fmt.Fprintf(&batch, "%d {\"i\": %d}\n", i*1000, i)
+	}
+	batch.WriteString("QUIT\n")
+	if _, err := c.conn.Write([]byte(batch.String())); err != nil {
+		t.Fatalf("Failed to write batch: %v", err)
+	}
+
+	for i := 1; i <= n+1; i++ {
+		resp, err := c.reader.ReadString('\n')
+		if err != nil {
+			t.Fatalf("Failed to read response %d: %v", i, err)
+		}
+		resp = strings.TrimSpace(resp)
+
+		var want string
+		switch {
+		case i == n+1:
+			want = "OK bye"
+		case i == bad:
+			if !strings.HasPrefix(resp, "ERROR invalid JSON") {
+				t.Fatalf("Expected ERROR for line %d, got %q", i, resp)
+			}
+			continue
+		default:
+			want = fmt.Sprintf("OK %d", i*1000)
+		}
+		if resp != want {
+			t.Fatalf("Expected %q for line %d, got %q", want, i, resp)
+		}
+	}
+}
+
+func TestStopFlushesHeldResponses(t *testing.T) {
+	l, storeService := newTestListener(t)
+	key := createTestStore(t, storeService, "stopping", "json")
+
+	c := dialTestListener(t, l)
+	if resp := c.send("AUTH stopping " + key); resp != "OK" {
+		t.Fatalf("Expected OK for AUTH, got %q", resp)
+	}
+
+	const n = 20
+	var batch strings.Builder
+	for i := 1; i <= n; i++ {
+		fmt.Fprintf(&batch, "%d {\"i\": %d}\n", i*1000, i)
+	}
+	if _, err := c.conn.Write([]byte(batch.String())); err != nil {
+		t.Fatalf("Failed to write batch: %v", err)
+	}
+
+	// Wait until every line is stored, then stop before reading anything
+	deadline := time.Now().Add(5 * time.Second)
+	for countObjects(t, storeService, "stopping") < n {
+		if time.Now().After(deadline) {
+			t.Fatal("Timed out waiting for lines to be stored")
+		}
+		time.Sleep(10 * time.Millisecond)
+	}
+	stopWithin(t, l, 5*time.Second)
+
+	// Responses for stored lines still arrive before the connection closes
+	for i := 1; i <= n; i++ {
+		resp, err := c.reader.ReadString('\n')
+		if err != nil {
+			t.Fatalf("Failed to read response %d after Stop: %v", i, err)
+		}
+		if want := fmt.Sprintf("OK %d", i*1000); strings.TrimSpace(resp) != want {
+			t.Fatalf("Expected %q, got %q", want, strings.TrimSpace(resp))
+		}
+	}
+	if _, err := c.reader.ReadString('\n'); err == nil {
+		t.Error("Expected the connection to be closed after Stop")
+	}
+}
@@ -478,21 +478,17 @@ func (p *Pusher) sendNewData() error {
 // feedToAccumulator parses data and feeds it to the accumulator,
 // sending any completed window result over the WebSocket.
 func (p *Pusher) feedToAccumulator(handle *store.ObjectHandle, rawData []byte) error {
-	// Expand schema data
-	var jsonData []byte
+	// Decode once; schema stores map indices straight to field names,
+	// falling back to the raw data if that fails
+	var parsed map[string]interface{}
+	var err error
 	if p.store.DataType() == store.DataTypeSchema {
-		expanded, err := p.store.ExpandData(rawData, 0)
-		if err != nil {
-			jsonData = rawData
-		} else {
-			jsonData = expanded
-		}
-	} else {
-		jsonData = rawData
+		parsed, err = p.store.DecodeData(rawData, 0)
 	}
-
-	var parsed map[string]interface{}
-	if err := json.Unmarshal(jsonData, &parsed); err != nil {
+	if parsed == nil {
+		err = json.Unmarshal(rawData, &parsed)
+	}
+	if err != nil {
 		// Skip unparseable records but advance cursor
 		p.mu.Lock()
 		p.lastTimestamp = handle.Timestamp
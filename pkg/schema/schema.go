@@ -197,6 +197,11 @@ func (ss *SchemaSet) buildCache(version int, s *Schema) {
 }
 
 // FullToCompact converts full JSON to compact JSON using the current schema.
+// Fields not in the schema are rejected, so the data is validated as it is converted.
+// Keys that are already field indices are passed through, so clients may send
+// compact JSON directly and skip retransmitting field names.
+// Values are copied verbatim, so integers keep their exact digits rather than
+// passing through float64.
 // Input: {"temperature": 72.5, "humidity": 45}
 // Output: {"1": 72.5, "2": 45}
 func (ss *SchemaSet) FullToCompact(data []byte) ([]byte, error) {
@@ -204,20 +209,32 @@ func (ss *SchemaSet) FullToCompact(data []byte) ([]byte, error) {
 		return nil, ErrInvalidSchema
 	}
 
-	var full map[string]interface{}
+	var full map[string]json.RawMessage
 	if err := json.Unmarshal(data, &full); err != nil {
 		return nil, fmt.Errorf("%w: %v", ErrInvalidJSON, err)
 	}
 
 	nameToIdx := ss.nameToIndex[ss.CurrentVersion]
-	compact := make(map[string]interface{})
+	idxToName := ss.indexToName[ss.CurrentVersion]
+	compact := make(map[string]json.RawMessage, len(full))
 
 	for name, value := range full {
 		idx, ok := nameToIdx[name]
 		if !ok {
-			return nil, fmt.Errorf("%w: %s", ErrFieldNotInSchema, name)
+			// Keys that are already field indices pass through
+			n, err := strconv.Atoi(name)
+			if _, known := idxToName[n]; err != nil || !known {
+				return nil, fmt.Errorf("%w: %s", ErrFieldNotInSchema, name)
+			}
+			idx = n
+		}
+
+		// A field given both by name and by index is ambiguous
+		key := strconv.Itoa(idx)
+		if _, dup := compact[key]; dup {
+			return nil, fmt.Errorf("%w: field %s given more than once", ErrInvalidJSON, idxToName[idx])
 		}
-		compact[strconv.Itoa(idx)] = value
+		compact[key] = value
 	}
 
 	return json.Marshal(compact)
@@ -225,9 +242,28 @@ func (ss *SchemaSet) FullToCompact(data []byte) ([]byte, error) {
 
 // CompactToFull converts compact JSON to full JSON.
 // If version is 0, uses the current schema version.
+// Values are copied verbatim, as in FullToCompact.
 // Input: {"1": 72.5, "2": 45}
 // Output: {"temperature": 72.5, "humidity": 45}
 func (ss *SchemaSet) CompactToFull(data []byte, version int) ([]byte, error) {
+	full, err := decodeCompact[json.RawMessage](ss, data, version)
+	if err != nil {
+		return nil, err
+	}
+
+	return json.Marshal(full)
+}
+
+// DecodeCompact decodes compact JSON into a map keyed by full field names.
+// Callers that need the values rather than JSON avoid re-encoding and
+// decoding the expanded form.
+// If version is 0, uses the current schema version.
+func (ss *SchemaSet) DecodeCompact(data []byte, version int) (map[string]interface{}, error) {
+	return decodeCompact[interface{}](ss, data, version)
+}
+
+// decodeCompact decodes compact JSON into a map of V keyed by full field names.
+func decodeCompact[V any](ss *SchemaSet, data []byte, version int) (map[string]V, error) {
 	if version == 0 {
 		version = ss.CurrentVersion
 	}
@@ -241,12 +277,12 @@ func (ss *SchemaSet) CompactToFull(data []byte, version int) ([]byte, error) {
 		return nil, fmt.Errorf("%w: version %d", ErrVersionMismatch, version)
 	}
 
-	var compact map[string]interface{}
+	var compact map[string]V
 	if err := json.Unmarshal(data, &compact); err != nil {
 		return nil, fmt.Errorf("%w: %v", ErrInvalidJSON, err)
 	}
 
-	full := make(map[string]interface{})
+	full := make(map[string]V, len(compact))
 
 	for key, value := range compact {
 		idx, err := strconv.Atoi(key)
@@ -261,7 +297,7 @@ func (ss *SchemaSet) CompactToFull(data []byte, version int) ([]byte, error) {
 		full[name] = value
 	}
 
-	return json.Marshal(full)
+	return full, nil
 }
 
 // ValidateData validates that JSON data conforms to the current schema.
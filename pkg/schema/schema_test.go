@@ -6,6 +6,7 @@ package schema
 
 import (
 	"encoding/json"
+	"errors"
 	"testing"
 )
 
@@ -117,6 +118,45 @@ func TestFullToCompact(t *testing.T) {
 	}
 }
 
+func TestFullToCompactAcceptsCompact(t *testing.T) {
+	ss := NewSchemaSet()
+	_, err := ss.AddSchema(&Schema{
+		Fields: []Field{
+			{Index: 1, Name: "temperature", Type: FieldTypeFloat32},
+			{Index: 2, Name: "humidity", Type: FieldTypeFloat32},
+		},
+	})
+	if err != nil {
+		t.Fatalf("AddSchema failed: %v", err)
+	}
+
+	compact, err := ss.FullToCompact([]byte(`{"1": 72.5, "humidity": 45}`))
+	if err != nil {
+		t.Fatalf("FullToCompact failed: %v", err)
+	}
+
+	var result map[string]interface{}
+	if err := json.Unmarshal(compact, &result); err != nil {
+		t.Fatalf("Failed to unmarshal compact: %v", err)
+	}
+
+	if result["1"] != 72.5 {
+		t.Errorf("Expected temperature=72.5, got %v", result["1"])
+	}
+	if result["2"] != float64(45) {
+		t.Errorf("Expected humidity=45, got %v", result["2"])
+	}
+
+	if _, err := ss.FullToCompact([]byte(`{"3": 1}`)); !errors.Is(err, ErrFieldNotInSchema) {
+		t.Errorf("Expected ErrFieldNotInSchema for unknown index, got %v", err)
+	}
+
+	// The same field by name and by index must not silently pick one value
+	if _, err := ss.FullToCompact([]byte(`{"temperature": 1, "1": 2}`)); !errors.Is(err, ErrInvalidJSON) {
+		t.Errorf("Expected ErrInvalidJSON for duplicate field, got %v", err)
+	}
+}
+
 func TestCompactToFull(t *testing.T) {
 	ss := NewSchemaSet()
 	_, err := ss.AddSchema(&Schema{
@@ -152,6 +192,64 @@ func TestCompactToFull(t *testing.T) {
 	}
 }
 
+func TestCompactRoundTripPreservesIntegers(t *testing.T) {
+	ss := NewSchemaSet()
+	_, err := ss.AddSchema(&Schema{
+		Fields: []Field{
+			{Index: 1, Name: "bytes", Type: FieldTypeInt64},
+		},
+	})
+	if err != nil {
+		t.Fatalf("AddSchema failed: %v", err)
+	}
+
+	// Not representable as float64
+	input := `{"bytes":9007199254740993}`
+	compact, err := ss.FullToCompact([]byte(input))
+	if err != nil {
+		t.Fatalf("FullToCompact failed: %v", err)
+	}
+	if string(compact) != `{"1":9007199254740993}` {
+		t.Errorf("Expected integer copied verbatim, got %s", compact)
+	}
+
+	full, err := ss.CompactToFull(compact, 0)
+	if err != nil {
+		t.Fatalf("CompactToFull failed: %v", err)
+	}
+	if string(full) != input {
+		t.Errorf("Expected %s, got %s", input, full)
+	}
+}
+
+func TestDecodeCompact(t *testing.T) {
+	ss := NewSchemaSet()
+	_, err := ss.AddSchema(&Schema{
+		Fields: []Field{
+			{Index: 1, Name: "temperature", Type: FieldTypeFloat32},
+			{Index: 2, Name: "sensor_id", Type: FieldTypeString},
+		},
+	})
+	if err != nil {
+		t.Fatalf("AddSchema failed: %v", err)
+	}
+
+	full, err := ss.DecodeCompact([]byte(`{"1": 72.5, "2": "living-room", "9": true}`), 0)
+	if err != nil {
+		t.Fatalf("DecodeCompact failed: %v", err)
+	}
+
+	if full["temperature"] != 72.5 {
+		t.Errorf("Expected temperature=72.5, got %v", full["temperature"])
+	}
+	if full["sensor_id"] != "living-room" {
+		t.Errorf("Expected sensor_id=living-room, got %v", full["sensor_id"])
+	}
+	if len(full) != 2 {
+		t.Errorf("Expected unknown index to be skipped, got %v", full)
+	}
+}
+
 func TestRoundTrip(t *testing.T) {
 	ss := NewSchemaSet()
 	_, err := ss.AddSchema(&Schema{
@@ -347,3 +445,22 @@ func TestSchemaSetSerialization(t *testing.T) {
 		t.Error("Expected non-empty compact output")
 	}
 }
+
+func TestFullToCompactRejectsInvalid(t *testing.T) {
+	ss := NewSchemaSet()
+	_, err := ss.AddSchema(&Schema{
+		Fields: []Field{
+			{Index: 1, Name: "temperature", Type: FieldTypeFloat32},
+		},
+	})
+	if err != nil {
+		t.Fatalf("AddSchema failed: %v", err)
+	}
+
+	if _, err := ss.FullToCompact([]byte(`{"temperature": 72.5, "unknown": 1}`)); !errors.Is(err, ErrFieldNotInSchema) {
+		t.Errorf("Expected ErrFieldNotInSchema, got %v", err)
+	}
+	if _, err := ss.FullToCompact([]byte(`{"temperature": `)); !errors.Is(err, ErrInvalidJSON) {
+		t.Errorf("Expected ErrInvalidJSON, got %v", err)
+	}
+}
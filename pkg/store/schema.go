@@ -82,12 +82,8 @@ func (s *Store) ValidateAndCompact(data []byte) ([]byte, error) {
 		return nil, ErrSchemaRequired
 	}
 
-	// Validate the data
-	if err := s.schemaSet.ValidateData(data); err != nil {
-		return nil, err
-	}
-
-	// Convert to compact format
+	// Conversion rejects invalid JSON and unknown fields, so the data is
+	// validated and compacted in a single decode
 	return s.schemaSet.FullToCompact(data)
 }
 
@@ -108,6 +104,23 @@ func (s *Store) ExpandData(data []byte, schemaVersion int) ([]byte, error) {
 	return s.schemaSet.CompactToFull(data, schemaVersion)
 }
 
+// DecodeData decodes compact data into a map keyed by full field names.
+// Only valid for schema stores.
+func (s *Store) DecodeData(data []byte, schemaVersion int) (map[string]interface{}, error) {
+	s.mu.RLock()
+	defer s.mu.RUnlock()
+
+	if s.meta.DataType != DataTypeSchema {
+		return nil, ErrSchemaNotSupported
+	}
+
+	if s.schemaSet == nil {
+		return nil, ErrSchemaRequired
+	}
+
+	return s.schemaSet.DecodeCompact(data, schemaVersion)
+}
+
 // saveSchemaLocked persists the schema to disk. Lock must be held.
 func (s *Store) saveSchemaLocked() error {
 	schemaPath := filepath.Join(s.path, schemaFileName)